@@ -1,57 +1,98 @@
+from bisect import bisect_left
 from collections import UserDict
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import accumulate
 import pickle
 import os
 import re
+import sys
+import time
+try:
+    import readline
+except ImportError:  # Not available on Windows; input() works without it.
+    readline = None
 from rich.console import Console
+from rich.measure import Measurement
 from rich.table import Table
 from rich.text import Text
-import difflib
 
 console = Console()
 
+HASHTAG_PATTERN = re.compile(r"#(\w+)")
+
+TABLE_COLUMNS = [
+    ("Name", "bold magenta"),
+    ("Phones", "green"),
+    ("Birthday", "cyan"),
+    ("Email", "blue"),
+    ("Address", "white"),
+    ("Notes", "yellow"),
+]
+
 def show_all_rich(book):
     if not book:
         console.print("😓 Address book is empty.", style="yellow")
         return
 
+    rows = []
+    widths = [measure_cell(header) for header, _ in TABLE_COLUMNS]
+    for record in book.values():
+        cells, cell_widths = record.table_row()
+        rows.append(cells)
+        widths = [max(width, cell_width) for width, cell_width in zip(widths, cell_widths)]
+
+    # Each column adds two characters of padding and one border, plus the
+    # closing border. If the table fits, give Rich the widths we already know
+    # so it does not measure every cell again; otherwise let it shrink columns.
+    fits = sum(widths) + 3 * len(widths) + 1 <= console.width
     table = Table(title="📒 Address Book", show_lines=True)
-    table.add_column("Name", style="bold magenta")
-    table.add_column("Phones", style="green")
-    table.add_column("Birthday", style="cyan")
-    table.add_column("Email", style="blue")
-    table.add_column("Address", style="white")
-    table.add_column("Notes", style="yellow")
+    for (header, style), width in zip(TABLE_COLUMNS, widths):
+        table.add_column(header, style=style, width=width if fits else None)
 
-    for record in book.values():
-        phones = ", ".join(phone.value for phone in record.phones) if record.phones else "-"
-        birthday = record.birthday.value if record.birthday else "-"
-        email = record.email.value if record.email else "-"
-        address = record.address.value if record.address else "-"
-
-        notes_block = Text("-")
-        if record.notes:
-            notes_block = Text()
-            for note in record.notes:
-                note_text = Text(note.text, style="bold yellow")
-                tags_text = Text(" " + " ".join(f"#{tag}" for tag in note.tags), style="dim") if note.tags else Text("")
-                notes_block.append_text(note_text)
-                notes_block.append_text(tags_text)
-                notes_block.append("\n")
-
-        table.add_row(
-            record.name.value,
-            phones,
-            birthday,
-            email,
-            address,
-            notes_block
-        )
+    for cells in rows:
+        table.add_row(*cells)
 
     console.print(table)
     return ""
 
+def measure_cell(renderable):
+    # Measure without the terminal width so cached widths survive a resize.
+    options = console.options.update_width(sys.maxsize)
+    return Measurement.get(console, options, renderable).maximum
+
+def build_row(record):
+    phones = record.phones_text() if record.phones else "-"
+    birthday = record.birthday.value if record.birthday else "-"
+    email = record.email.value if record.email else "-"
+    address = record.address.value if record.address else "-"
+
+    notes_block = Text("-")
+    if record.notes:
+        notes_block = Text()
+        for note in record.notes.values():
+            note_text = Text(note.text, style="bold yellow")
+            tags_text = Text(" " + " ".join(f"#{tag}" for tag in note.tags), style="dim") if note.tags else Text("")
+            notes_block.append_text(note_text)
+            notes_block.append_text(tags_text)
+            notes_block.append("\n")
+
+    cells = (
+        record.name.value,
+        phones,
+        birthday,
+        email,
+        address,
+        notes_block
+    )
+    return cells, [measure_cell(cell) for cell in cells]
+
 DEFAULT_FILENAME = "address_book.pkl"
+# Seconds between saves while there are unsaved changes.
+SAVE_INTERVAL = 5
+
+MSG_CONTACT_NOT_FOUND = "😓 Contact not found."
+MSG_NOTE_NOT_FOUND = "😓 Note not found."
 
 class Field:
     def __init__(self, value):
@@ -65,11 +106,12 @@ class Name(Field):
 
 class Phone(Field):
     VALID_CODES = ["050", "066", "067", "068", "095", "096", "097", "098", "099", "063", "073", "093"]
+    VALID_CODE_SET = frozenset(VALID_CODES)
 
     def __init__(self, value):
-        if not value.isdigit() or len(value) != 10:
+        if len(value) != 10 or not value.isdigit():
             raise ValueError("😓 Phone number must contain exactly 10 digits.")
-        if not any(value.startswith(code) for code in self.VALID_CODES):
+        if value[:3] not in self.VALID_CODE_SET:
             raise ValueError(f"😓 The phone number must start with a valid code: {', '.join(self.VALID_CODES)}.")
         super().__init__(value)
 
@@ -84,6 +126,12 @@ class Birthday(Field):
         if birthday_date.year < 1930:
             raise ValueError("😓 Unrealistic birthday. Please try again.")
         super().__init__(value)
+        self.date = birthday_date
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "date" not in state:
+            self.date = datetime.strptime(self.value, "%d.%m.%Y").date()
 
 class Address(Field):
     pass
@@ -94,27 +142,49 @@ class Email(Field):
             raise ValueError("😓 Invalid email format. Please use name@example.com")
         super().__init__(value)
 
+    @staticmethod
+    def is_email_part(part):
+        # Letters, digits, "_", "." and "-" only (same as [\w.-] in a regex).
+        rest = part.replace(".", "").replace("-", "").replace("_", "")
+        return not rest or rest.isalnum()
+
     @staticmethod
     def validate_email(value):
-        pattern = r"^[\w\.-]+@[\w\.-]+\.\w+$"
-        return re.match(pattern, value) is not None
+        local, at, domain = value.partition("@")
+        dot = domain.rfind(".")
+        if not at or not local or dot < 1 or dot == len(domain) - 1:
+            return False
+        return (
+            Email.is_email_part(local)
+            and Email.is_email_part(domain)
+            and "-" not in domain[dot + 1:]
+        )
 
 class Note(Field):
     
-    TAG_PATTERN = re.compile(r"^[a-zA-Z0-9_]{1,30}$")
+    MAX_TAG_LENGTH = 30
     
     def __init__(self, text, tags=None):
         self.text = text.strip()
+        self._norm = self.text.lower()
         self.tags = set()
         for tag in (tags or []):
             self.add_tag(tag)
 
     def add_tag(self, tag):
         tag_clean = tag.lstrip("#").lower()
-        if not self.TAG_PATTERN.fullmatch(tag_clean):
+        if not self.is_valid_tag(tag_clean):
             raise ValueError(f"😓 Invalid tag: '{tag}'. Only letters, digits, and underscores are allowed (1–30 chars).")
         self.tags.add(tag_clean)
 
+    @classmethod
+    def is_valid_tag(cls, tag):
+        # ASCII letters, digits and underscores only.
+        if not 0 < len(tag) <= cls.MAX_TAG_LENGTH or not tag.isascii():
+            return False
+        rest = tag.replace("_", "")
+        return not rest or rest.isalnum()
+
     def remove_tag(self, tag):
         self.tags.discard(tag.lstrip("#").lower())
 
@@ -128,82 +198,154 @@ class Note(Field):
     def __eq__(self, other):
         return isinstance(other, Note) and self.text == other.text and self.tags == other.tags
 
+    def __getstate__(self):
+        return {key: value for key, value in self.__dict__.items() if not key.startswith("_")}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._norm = self.text.strip().lower()
+
 
 class Record:
     def __init__(self, name):
         self.name = Name(name)
-        self.phones = []
+        self._name_lower = name.lower()
+        self.phones = {}
         self.birthday = None
         self.address = None
         self.email = None
-        self.notes = []
-    
+        self.notes = {}
+        self._clear_cache()
+
+    def __getstate__(self):
+        # Underscore attributes are caches and are rebuilt after loading.
+        return {key: value for key, value in self.__dict__.items() if not key.startswith("_")}
+
+    def __setstate__(self, state):
+        # Records saved by older versions may lack the newer fields.
+        self.__dict__.update({"address": None, "email": None, "notes": []} | state)
+        # Older versions kept phones and notes in lists.
+        if isinstance(self.phones, list):
+            self.phones = {phone.value: phone for phone in self.phones}
+        if isinstance(self.notes, list):
+            # Old lists could hold notes differing only by case; keep the
+            # first and fold the later ones' tags into it.
+            notes = {}
+            for note in self.notes:
+                if note._norm in notes:
+                    notes[note._norm].tags |= note.tags
+                else:
+                    notes[note._norm] = note
+            self.notes = notes
+        self._name_lower = self.name.value.lower()
+        self._clear_cache()
+
+    def _clear_cache(self):
+        self._search_text = None
+        self._row_cache = None
+        self._str_cache = None
+        self._phones_text = None
+
+    def table_row(self):
+        if self._row_cache is None:
+            self._row_cache = build_row(self)
+        return self._row_cache
+
+    def phones_text(self):
+        if self._phones_text is None:
+            self._phones_text = ", ".join(self.phones)
+        return self._phones_text
+
+    def search_text(self):
+        # Fields are joined with newlines, which a search query never contains,
+        # so a single substring test cannot match across two fields.
+        if self._search_text is None:
+            fields = [self.name.value]
+            fields.extend(self.phones)
+            fields.append(self.email.value if self.email else "")
+            fields.append(self.address.value if self.address else "")
+            fields.append(self.birthday.value if self.birthday else "")
+            self._search_text = "\n".join(fields).lower()
+        return self._search_text
+
+    def rename(self, new_name):
+        self.name = Name(new_name)
+        self._name_lower = new_name.lower()
+        self._clear_cache()
 
     def add_phone(self, phone, book):
         try:
             phone_obj = Phone(phone)
         except ValueError as e:
             return str(e)
-        if any(p.value == phone for p in self.phones):
+        if phone in self.phones:
             return f"😓 The number '{phone}' already exists for this contact."
-        for record in book.data.values():
-            if record != self and any(p.value == phone for p in record.phones):
-                return f"😓 The number '{phone}' already belongs to '{record.name.value}'."
-        self.phones.append(phone_obj)
+        owner = book.phone_owner(phone)
+        if owner is not None and owner is not self:
+            return f"😓 The number '{phone}' already belongs to '{owner.name.value}'."
+        self.phones[phone] = phone_obj
+        self._clear_cache()
         return None
 
     def remove_phone(self, phone):
-        phone_obj = self.find_phone(phone)
-        if phone_obj:
-            self.phones.remove(phone_obj)
-            return True
-        return False
+        if self.phones.pop(phone, None) is None:
+            return False
+        self._clear_cache()
+        return True
 
     def edit_phone(self, old_phone, new_phone, book):
-        if not self.find_phone(old_phone):
+        if old_phone not in self.phones:
             return f"😓 The old number '{old_phone}' was not found."
         try:
             new_phone_obj = Phone(new_phone)
         except ValueError as e:
             return str(e)
-        for record in book.data.values():
-            if record != self and any(p.value == new_phone for p in record.phones):
-                return f"😓 The new number '{new_phone}' already belongs to '{record.name.value}'."
-        for i, phone in enumerate(self.phones):
-            if phone.value == old_phone:
-                self.phones[i] = new_phone_obj
-                return None
-        return "😓 Something went wrong while updating the number."
+        if new_phone != old_phone and new_phone in self.phones:
+            return f"😓 The number '{new_phone}' already exists for this contact."
+        owner = book.phone_owner(new_phone)
+        if owner is not None and owner is not self:
+            return f"😓 The new number '{new_phone}' already belongs to '{owner.name.value}'."
+        # Rebuild the dict so the new number keeps the old one's position.
+        self.phones = {
+            (new_phone if value == old_phone else value): (new_phone_obj if value == old_phone else phone)
+            for value, phone in self.phones.items()
+        }
+        self._clear_cache()
+        return None
 
     def find_phone(self, phone):
-        for p in self.phones:
-            if p.value == phone:
-                return p
-        return None
+        return self.phones.get(phone)
 
     def add_birthday(self, birthday_str):
         self.birthday = Birthday(birthday_str)
+        self._clear_cache()
 
     def edit_birthday(self, new_birthday):
         self.birthday = Birthday(new_birthday)
+        self._clear_cache()
 
     def remove_birthday(self):
         self.birthday = None
+        self._clear_cache()
 
     def add_address(self, address):
         self.address = Address(address)
+        self._clear_cache()
 
     def edit_address(self, new_address):
         if self.address:
             self.address.value = new_address
+            self._clear_cache()
         else:
             self.add_address(new_address)
 
     def remove_address(self):
         self.address = None
+        self._clear_cache()
 
     def add_email(self, email):
         self.email = Email(email)
+        self._clear_cache()
 
     def edit_email(self, new_email):
         if self.email:
@@ -211,129 +353,265 @@ class Record:
                 self.email = Email(new_email)
             except ValueError as e:
                 return str(e)
+            self._clear_cache()
         else:
             return "😓 Email is not set. Use 'addemail' to add one."
 
     def remove_email(self):
         self.email = None
+        self._clear_cache()
 
     def add_note(self, text, tags=None):
         new_note = Note(text, tags)
+        key = new_note._norm
 
-        for existing_note in self.notes:
-            if existing_note.text.strip().lower() == new_note.text.strip().lower():
-                return None
+        if key in self.notes:
+            return None
 
-        self.notes.append(new_note)
+        self.notes[key] = new_note
+        self._clear_cache()
         return new_note
 
     def remove_note(self, text):
-        normalized_input = re.sub(r"#\w+", "", text).strip().lower()
-        for note in self.notes:
-            if note.text.strip().lower() == normalized_input:
-                self.notes.remove(note)
-                return "✅ Note removed!"
-        return "😓 Note not found."
+        note = self.notes.pop(HASHTAG_PATTERN.sub("", text).strip().lower(), None)
+        if note is not None:
+            self._clear_cache()
+        return note
 
     def edit_note(self, old_text, new_text):
-        normalized_old = old_text.strip().lower()
-        cleaned_new_text = re.sub(r"#\w+", "", new_text).strip()
-        new_tags = re.findall(r"#(\w+)", new_text)
-
-        for i, note in enumerate(self.notes):
-            if note.text.strip().lower() == normalized_old:
-                self.notes[i] = Note(cleaned_new_text, new_tags)
-                return "✅ Note edited!"
-        return "😓 Note not found."
+        old_key = old_text.strip().lower()
+        if old_key not in self.notes:
+            return MSG_NOTE_NOT_FOUND, None
+
+        cleaned_new_text, new_tags = split_tags_from_text(new_text)
+        new_note = Note(cleaned_new_text, new_tags)
+        new_key = new_note._norm
+        if new_key != old_key and new_key in self.notes:
+            return "😓 A note with this text already exists.", None
+
+        # Rebuild the dict so the edited note keeps its position.
+        self.notes = {
+            (new_key if key == old_key else key): (new_note if key == old_key else note)
+            for key, note in self.notes.items()
+        }
+        self._clear_cache()
+        return "✅ Note edited!", new_note
     
+    def clear_notes(self):
+        self.notes.clear()
+        self._clear_cache()
+
+    def add_note_tag(self, note, tag):
+        note.add_tag(tag)
+        self._clear_cache()
+
+    def remove_note_tag(self, note, tag=None):
+        if tag is None:
+            note.tags.clear()
+        else:
+            note.remove_tag(tag)
+        self._clear_cache()
+
     def get_notes_by_tag(self, tag):
-        return [note for note in self.notes if note.has_tag(tag)]
+        return [note for note in self.notes.values() if note.has_tag(tag)]
 
     def __str__(self):
-        phones_str = "; ".join(str(p) for p in self.phones) if self.phones else "No phone numbers available."
+        if self._str_cache is not None:
+            return self._str_cache
+        phones_str = "; ".join(str(p) for p in self.phones.values()) if self.phones else "No phone numbers available."
         birthday_str = f", Birthday: {self.birthday}" if self.birthday else ""
         address_str = f", Address: {self.address}" if self.address else ""
         email_str = f", Email: {self.email}" if self.email else ""
-        notes_str = f", Notes: {'; '.join(str(note) for note in self.notes)}" if self.notes else ""
-        return f"👤 {self.name.value}: {phones_str}{birthday_str}{email_str}{address_str}{notes_str}"
+        notes_str = f", Notes: {'; '.join(str(note) for note in self.notes.values())}" if self.notes else ""
+        self._str_cache = f"👤 {self.name.value}: {phones_str}{birthday_str}{email_str}{address_str}{notes_str}"
+        return self._str_cache
 
 class AddressBook(UserDict):
+    def __init__(self):
+        super().__init__()
+        self._dirty = False
+        self._build_indexes()
+
+    def __getstate__(self):
+        return {"data": self.data}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._dirty = False
+        self._build_indexes()
+
+    def _build_indexes(self):
+        self._name_index = {}
+        self._name_trie = {}
+        self._phone_index = {}
+        self._tag_index = {}
+        self._sorted_tag_render = None
+        self._note_positions = None
+        for record in self.data.values():
+            self._index_record(record)
+
+    def _index_record(self, record):
+        self._name_index[record.name.value.lower()] = record.name.value
+        node = self._name_trie
+        for word in record.name.value.lower().split():
+            node = node.setdefault(word, {})
+        node[None] = record.name.value
+        for phone in record.phones.values():
+            self.index_phone(record, phone.value)
+        for note in record.notes.values():
+            self.index_note(record, note)
+
+    def _unindex_record(self, record):
+        self._name_index.pop(record.name.value.lower(), None)
+        words = record.name.value.lower().split()
+        path = [self._name_trie]
+        for word in words:
+            if word not in path[-1]:
+                break
+            path.append(path[-1][word])
+        else:
+            path[-1].pop(None, None)
+            # Prune branches that no longer lead to any name.
+            for depth in range(len(words) - 1, -1, -1):
+                if path[depth + 1]:
+                    break
+                del path[depth][words[depth]]
+        for phone in record.phones.values():
+            self.unindex_phone(record, phone.value)
+        for note in record.notes.values():
+            self.unindex_note(record, note)
+
+    def index_note(self, record, note, tags=None):
+        self._sorted_tag_render = None
+        self._note_positions = None
+        for tag in note.tags if tags is None else tags:
+            self._tag_index.setdefault(tag, []).append((record, note))
+
+    def unindex_note(self, record, note, tags=None):
+        self._sorted_tag_render = None
+        self._note_positions = None
+        for tag in list(note.tags if tags is None else tags):
+            entries = [entry for entry in self._tag_index.get(tag, []) if entry[1] is not note]
+            if entries:
+                self._tag_index[tag] = entries
+            else:
+                self._tag_index.pop(tag, None)
+
+    def note_positions(self):
+        # (contact index, note index) of every tagged note. Only their relative
+        # order is used, and anything that changes it goes through index_note
+        # or unindex_note, which drop the cached map.
+        if self._note_positions is None:
+            self._note_positions = {
+                id(note): (i, j)
+                for i, record in enumerate(self.data.values())
+                for j, note in enumerate(record.notes.values())
+                if note.tags
+            }
+        return self._note_positions
+
+    def notes_with_tag(self, tag):
+        # Index lists follow tagging history; report them in book order.
+        entries = self._tag_index.get(tag.lstrip("#").lower(), [])
+        positions = self.note_positions()
+        return sorted(entries, key=lambda entry: positions[id(entry[1])])
+
     def add_record(self, record):
+        replaced = self.data.get(record.name.value)
+        if replaced is not None:
+            self._unindex_record(replaced)
         self.data[record.name.value] = record
+        self._index_record(record)
+
+    def index_phone(self, record, phone):
+        self._phone_index[phone] = record
+
+    def unindex_phone(self, record, phone):
+        if self._phone_index.get(phone) is record:
+            del self._phone_index[phone]
+
+    def phone_owner(self, phone):
+        return self._phone_index.get(phone)
 
     def find(self, name):
-        name = name.lower()
-        for key, record in self.data.items():
-            if key.lower() == name:
-                return record
-        return None
+        key = self._name_index.get(name.lower())
+        return self.data[key] if key is not None else None
 
     def name_exists(self, name):
-        return any(name.lower() == key.lower() for key in self.data)
+        return name.lower() in self._name_index
+
+    def match_name_prefix(self, words, max_words):
+        # Find the shortest leading run of words (at most max_words) that names
+        # a contact. Returns the stored name and how many words it used.
+        node = self._name_trie
+        for i, word in enumerate(words[:max_words], 1):
+            node = node.get(normalize_name_part(word).lower())
+            if node is None:
+                break
+            if None in node:
+                return node[None], i
+        return None, 0
+
+    def find_matching(self, name):
+        name = name.lower()
+        return [record for record in self.data.values() if name in record._name_lower]
 
     def delete(self, name):
-        for key in list(self.data):
-            if key.lower() == name.lower():
-                del self.data[key]
-                return True
-        return False
+        key = self._name_index.get(name.lower())
+        if key is None:
+            return False
+        self._unindex_record(self.data.pop(key))
+        return True
 
     def search(self, query):
-        result = []
         query = query.lower()
-        for record in self.data.values():
-            name_match = query in record.name.value.lower()
-            phone_match = any(query in phone.value for phone in record.phones)
-            email_match = record.email and query in record.email.value.lower()
-            address_match = record.address and query in record.address.value.lower()
-            birthday_match = record.birthday and query in record.birthday.value.lower()
-            if name_match or phone_match or email_match or address_match or birthday_match:
-                result.append(str(record))
-        return result
+        return [str(record) for record in self.data.values() if query in record.search_text()]
 
     def get_upcoming_birthdays(self, days=7):
         today = datetime.today().date()
-        end_date = today + timedelta(days=days)
+        # Work out the congratulation date for each (month, day) in the window
+        # once, so every record only needs a single dict lookup.
+        window = {}
+        for offset in range(days + 1):
+            day = today + timedelta(days=offset)
+            congratulation_date = day
+            if congratulation_date.weekday() == 5:
+                congratulation_date += timedelta(days=2)
+            elif congratulation_date.weekday() == 6:
+                congratulation_date += timedelta(days=1)
+            window.setdefault((day.month, day.day), congratulation_date.strftime('%d.%m.%Y'))
         upcoming = []
         for record in self.data.values():
             if not record.birthday:
                 continue
-            try:
-                birthday_date = datetime.strptime(record.birthday.value, "%d.%m.%Y").date()
-                birthday_this_year = birthday_date.replace(year=today.year)
-                if birthday_this_year < today:
-                    birthday_this_year = birthday_this_year.replace(year=today.year + 1)
-                if today <= birthday_this_year <= end_date:
-                    congratulation_date = birthday_this_year
-                    if congratulation_date.weekday() == 5:
-                        congratulation_date += timedelta(days=2)
-                    elif congratulation_date.weekday() == 6:
-                        congratulation_date += timedelta(days=1)
-                    upcoming.append(f"{record.name.value}: {congratulation_date.strftime('%d.%m.%Y')}")
-            except ValueError:
-                continue
+            birthday_date = record.birthday.date
+            congratulation_date = window.get((birthday_date.month, birthday_date.day))
+            if congratulation_date:
+                upcoming.append(f"{record.name.value}: {congratulation_date}")
         return upcoming
 
 def save_address_book(book, filename=DEFAULT_FILENAME):
+    temp_filename = filename + ".tmp"
     try:
-        with open(filename, "wb") as file:
-            pickle.dump(book, file)
+        # Write to a side file first so a failed save can't truncate the old book.
+        with open(temp_filename, "wb") as file:
+            pickle.dump(book, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_filename, filename)
+        book._dirty = False
+        return True
     except Exception as e:
+        try:
+            os.remove(temp_filename)
+        except FileNotFoundError:
+            pass
         console.print(f"😓 Error saving address book to '{filename}': {e}", style="red")
+        return False
 
 def load_address_book(filename=DEFAULT_FILENAME):
     if os.path.exists(filename):
         try:
             with open(filename, "rb") as file:
-                book = pickle.load(file)
-                for record in book.values():
-                    if not hasattr(record, "address"):
-                        record.address = None
-                    if not hasattr(record, "email"):
-                        record.email = None
-                    if not hasattr(record, "notes"):
-                        record.notes = []
-                return book
+                return pickle.load(file)
         except Exception as e:
             console.print(f"😓 Error loading address book from '{filename}': {e}", style="red")
             console.print("Creating a new empty address book instead.", style="yellow")
@@ -344,10 +622,12 @@ def parse_input(user_input):
     cmd, *args = user_input.strip().split()
     return cmd.strip().lower(), args
 
+def normalize_name_part(part):
+    return "-".join(subpart.capitalize() for subpart in part.split("-"))
+
+@lru_cache(maxsize=4096)
 def normalize_name(name):
-    def fix_part(part):
-        return "-".join(subpart.capitalize() for subpart in part.split("-"))
-    return " ".join(fix_part(word) for word in name.strip().split())
+    return " ".join(normalize_name_part(word) for word in name.strip().split())
 
 def format_address(address: str) -> str:
     parts = address.split()
@@ -361,13 +641,68 @@ def format_address(address: str) -> str:
 
     return " ".join(formatted)
 
-def suggest_command(input_cmd, valid_commands):
-    prefix_matches = [cmd for cmd in valid_commands if cmd.startswith(input_cmd)]
+def edit_distance(first, second):
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, 1):
+        current = [i]
+        for j, second_char in enumerate(second, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (first_char != second_char)
+            ))
+        previous = current
+    return previous[-1]
+
+class BKTree:
+    def __init__(self, words):
+        self.root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node_word, children = self.root
+        while True:
+            distance = edit_distance(word, node_word)
+            if distance == 0:
+                return
+            if distance not in children:
+                children[distance] = (word, {})
+                return
+            node_word, children = children[distance]
+
+    def find(self, word, max_distance):
+        matches = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_word, children = stack.pop()
+            distance = edit_distance(word, node_word)
+            if distance <= max_distance:
+                matches.append((distance, node_word))
+            # Only subtrees within max_distance of this node can hold matches.
+            for child_distance, child in children.items():
+                if abs(child_distance - distance) <= max_distance:
+                    stack.append(child)
+        return [match for _, match in sorted(matches)]
+
+def commands_with_prefix(text):
+    matches = []
+    for cmd in SORTED_COMMANDS[bisect_left(SORTED_COMMANDS, text):]:
+        if not cmd.startswith(text):
+            break
+        matches.append(cmd)
+    return matches
+
+def suggest_command(input_cmd):
+    prefix_matches = commands_with_prefix(input_cmd)
 
     if prefix_matches:
         return f"🤔 Did you mean one of these commands: {', '.join(f'\'{cmd}\'' for cmd in prefix_matches)}? Please try again!"
 
-    fuzzy_matches = difflib.get_close_matches(input_cmd, valid_commands, n=5, cutoff=0.6)
+    fuzzy_matches = COMMAND_TREE.find(input_cmd, max_distance=2)[:5]
 
     if fuzzy_matches:
         if len(fuzzy_matches) == 1:
@@ -377,8 +712,16 @@ def suggest_command(input_cmd, valid_commands):
 
     return "😓 Sorry, that command doesn’t exist. Type 'help' to see available commands."
 
-def extract_tags_from_text(text):
-    return [tag[1:].lower() for tag in re.findall(r"#\w+", text)]
+def split_tags_from_text(text):
+    parts = []
+    tags = []
+    last = 0
+    for match in HASHTAG_PATTERN.finditer(text):
+        parts.append(text[last:match.start()])
+        tags.append(match.group(1).lower())
+        last = match.end()
+    parts.append(text[last:])
+    return "".join(parts).strip(), tags
 
 def input_error(func):
     error_messages = {
@@ -436,7 +779,7 @@ def input_error(func):
         except ValueError as e:
             return str(e) or error_messages.get(command, error_messages["default"])
         except KeyError:
-            return "😓 Contact not found."
+            return MSG_CONTACT_NOT_FOUND
         except IndexError:
             return error_messages.get(command, error_messages["default"])
         except Exception as e:
@@ -495,24 +838,22 @@ def add_contact(args, book, command="addcontact"):
         record.add_address(formatted_address)
 
     book.add_record(record)
+    book._dirty = True
     return "✅ Contact added!"
 
 @input_error
 def edit_contact_name(args, book, command="editname"):
     if len(args) < 2:
         raise IndexError
-    for i in range(1, len(args)):
-        old_name_try = normalize_name(" ".join(args[:i]))
-        if book.name_exists(old_name_try):
-            old_name = old_name_try
-            new_name = normalize_name(" ".join(args[i:]))
-            break
-    else:
+    old_name, i = book.match_name_prefix(args, len(args) - 1)
+    if old_name is None:
         raise KeyError
+    new_name = normalize_name(" ".join(args[i:]))
     record = book.find(old_name)
     book.delete(old_name)
-    record.name = Name(new_name)
+    record.rename(new_name)
     book.add_record(record)
+    book._dirty = True
     return f"✅ Contact name changed to '{new_name}'!"
 
 @input_error
@@ -528,6 +869,9 @@ def change_contact(args, book, command="changephone"):
     result = record.edit_phone(old_phone, new_phone, book)
     if result:
         return result
+    book.unindex_phone(record, old_phone)
+    book.index_phone(record, new_phone)
+    book._dirty = True
     return "✅ Phone number updated!"
 
 @input_error
@@ -542,6 +886,8 @@ def add_phone_to_contact(args, book, command="addphone"):
     result = record.add_phone(possible_phone, book)
     if result:
         return result
+    book.index_phone(record, possible_phone)
+    book._dirty = True
     return "✅ Phone number added!"
 
 @input_error
@@ -555,6 +901,8 @@ def remove_phone(args, book, command="removephone"):
         raise KeyError
     if not record.remove_phone(possible_phone):
         return f"😓 Phone number '{possible_phone}' not found."
+    book.unindex_phone(record, possible_phone)
+    book._dirty = True
     return "✅ Phone number removed!"
 
 @input_error
@@ -564,6 +912,7 @@ def remove_contact(args, book, command="removecontact"):
     name = normalize_name(" ".join(args))
     if not book.delete(name):
         raise KeyError
+    book._dirty = True
     return f"✅ Contact '{name}' removed!"
 
 @input_error
@@ -582,6 +931,7 @@ def add_birthday(args, book, command="addbday"):
     if record.birthday:
         return "😓 Birthday is already set. Use ‘editbday’ to change it."
     record.add_birthday(birthday)
+    book._dirty = True
     return "🎉 Birthday added!"
 
 @input_error
@@ -589,7 +939,7 @@ def show_birthday(args, book, command="showbday"):
     if not args:
         raise IndexError
     name = normalize_name(" ".join(args))
-    matches = [record for key, record in book.data.items() if name.lower() in key.lower()]
+    matches = book.find_matching(name)
     if not matches:
         raise KeyError
     if len(matches) == 1:
@@ -616,6 +966,7 @@ def edit_birthday(args, book, command="editbday"):
     if not record:
         raise KeyError
     record.edit_birthday(birthday)
+    book._dirty = True
     return "✅ Birthday updated!"
 
 @input_error
@@ -627,6 +978,7 @@ def remove_birthday(args, book, command="removebday"):
     if not record:
         raise KeyError
     record.remove_birthday()
+    book._dirty = True
     return "✅ Birthday removed!"
 
 @input_error
@@ -634,15 +986,15 @@ def show_phone(args, book, command="showphone"):
     if not args:
         raise IndexError
     name = normalize_name(" ".join(args))
-    matches = [record for key, record in book.data.items() if name.lower() in key.lower()]
+    matches = book.find_matching(name)
     if not matches:
         raise KeyError
     if len(matches) == 1:
         record = matches[0]
-        return f"{record.name.value}: {', '.join(p.value for p in record.phones)}"
+        return f"{record.name.value}: {record.phones_text()}"
 
     result = ["Multiple contacts found:"]
-    result += [f"{r.name.value}: {', '.join(p.value for p in r.phones)}" for r in matches]
+    result += [f"{r.name.value}: {r.phones_text()}" for r in matches]
     return "\n".join(result)
 
 @input_error
@@ -672,34 +1024,28 @@ def upcoming_birthdays(args, book, command="upcomingbdays"):
 def add_address(args, book, command="addaddress"):
     if len(args) < 2:
         raise IndexError
-    for i in range(1, len(args)):
-        possible_name = normalize_name(" ".join(args[:i]))
-        if book.name_exists(possible_name):
-            name = possible_name
-            address = " ".join(args[i:]).title()
-            break
-    else:
-        return "😓 Contact not found."
+    name, i = book.match_name_prefix(args, len(args) - 1)
+    if name is None:
+        return MSG_CONTACT_NOT_FOUND
+    address = " ".join(args[i:]).title()
     record = book.find(name)
     if record.address:
         return "😓 Address already exists. Use ‘editaddress’ to change it."
     record.add_address(address)
+    book._dirty = True
     return "✅ Address added!"
 
 @input_error
 def edit_address(args, book, command="editaddress"):
     if len(args) < 2:
         raise IndexError
-    for i in range(1, len(args)):
-        possible_name = normalize_name(" ".join(args[:i]))
-        if book.name_exists(possible_name):
-            name = possible_name
-            new_address = " ".join(args[i:]).title()
-            break
-    else:
-        return "😓 Contact not found."
+    name, i = book.match_name_prefix(args, len(args) - 1)
+    if name is None:
+        return MSG_CONTACT_NOT_FOUND
+    new_address = " ".join(args[i:]).title()
     record = book.find(name)
     record.edit_address(new_address)
+    book._dirty = True
     return "✅ Address updated!"
 
 @input_error
@@ -713,65 +1059,57 @@ def remove_address(args, book, command="removeaddress"):
     if not record.address:
         return "😓 Address is not set."
     record.remove_address()
+    book._dirty = True
     return "✅ Address removed!"
 
 @input_error
 def add_email(args, book, command="addemail"):
     if len(args) < 2:
         raise IndexError
-    for i in range(1, len(args)):
-        possible_name = normalize_name(" ".join(args[:i]))
-        if book.name_exists(possible_name):
-            name = possible_name
-            email = " ".join(args[i:])
-            break
-    else:
-        return "😓 Contact not found."
+    name, i = book.match_name_prefix(args, len(args) - 1)
+    if name is None:
+        return MSG_CONTACT_NOT_FOUND
+    email = " ".join(args[i:])
     record = book.find(name)
     if record.email:
         return "😓 Email already exists. Use ‘editemail’ to change it."
     record.add_email(email)
+    book._dirty = True
     return "✅ Email added!"
 
 @input_error
 def edit_email(args, book, command="editemail"):
     if len(args) < 2:
         raise IndexError
-    for i in range(1, len(args)):
-        possible_name = normalize_name(" ".join(args[:i]))
-        if book.name_exists(possible_name):
-            name = possible_name
-            new_email = " ".join(args[i:])
-            break
-    else:
-        return "😓 Contact not found."
+    name, i = book.match_name_prefix(args, len(args) - 1)
+    if name is None:
+        return MSG_CONTACT_NOT_FOUND
+    new_email = " ".join(args[i:])
     record = book.find(name)
     result = record.edit_email(new_email)
     if result is not None:
         return result
 
+    book._dirty = True
     return "✅ Email updated!"
 
 @input_error
 def remove_email(args, book, command="removeemail"):
     if not args:
         raise IndexError
-    for i in range(1, len(args) + 1):
-        possible_name = normalize_name(" ".join(args[:i]))
-        if book.name_exists(possible_name):
-            name = possible_name
-            break
-    else:
+    name, _ = book.match_name_prefix(args, len(args))
+    if name is None:
         return "😓 Please provide a valid contact name."
 
     record = book.find(name)
     if not record:
-        return "😓 Contact not found."
+        return MSG_CONTACT_NOT_FOUND
 
     if not record.email:
         return "😓 Email is not set."
 
     record.remove_email()
+    book._dirty = True
     return "✅ Email removed!"
 
 @input_error
@@ -779,23 +1117,20 @@ def add_note(args, book, command="addnote"):
     if len(args) < 2:
         raise IndexError
 
-    for i in range(1, len(args)):
-        name_try = normalize_name(" ".join(args[:i]))
-        if book.name_exists(name_try):
-            name = name_try
-            note_text = " ".join(args[i:])
-            break
-    else:
-        return "😓 Contact not found."
+    name, i = book.match_name_prefix(args, len(args) - 1)
+    if name is None:
+        return MSG_CONTACT_NOT_FOUND
+    note_text = " ".join(args[i:])
 
-    tags = extract_tags_from_text(note_text)
-    clean_text = re.sub(r"#\w+", "", note_text).strip()
+    clean_text, tags = split_tags_from_text(note_text)
 
     record = book.find(name)
     note_result = record.add_note(clean_text, tags)
 
     if note_result is None:
         return f"😓 Note already exists. Use 'editnote' to modify it."
+    book.index_note(record, note_result)
+    book._dirty = True
     return f"✅ Note added with tags: {', '.join(note_result.tags) if note_result.tags else 'none'}"
 
 @input_error
@@ -803,39 +1138,28 @@ def edit_note(args, book, command="editnote"):
     if len(args) < 3:
         raise IndexError
 
-    for i in range(1, len(args)):
-        name_try = normalize_name(" ".join(args[:i]))
-        if book.name_exists(name_try):
-            name = name_try
-            break
-    else:
+    name, i = book.match_name_prefix(args, len(args) - 1)
+    if name is None:
         return "😓 Please provide the contact name, old note text and new note text."
 
     record = book.find(name)
     remaining = args[i:]
 
-    for j in range(1, len(remaining)):
-        old_candidate = " ".join(remaining[:j]).strip().lower()
-        for note in record.notes:
-            if note.text.strip().lower() == old_candidate:
-                old_text = " ".join(remaining[:j])
-                new_text = " ".join(remaining[j:])
-                break
-        else:
-            continue
-        break
+    old_texts = accumulate(remaining[:-1], lambda text, word: f"{text} {word}")
+    for j, old_text in enumerate(old_texts, 1):
+        old_note = record.notes.get(old_text.strip().lower())
+        if old_note is not None:
+            new_text = " ".join(remaining[j:])
+            break
     else:
         return "😓 Old note not found. Please check the old note text. Be exact."
 
-    tags = extract_tags_from_text(new_text)
-    clean_new_text = re.sub(r"#\w+", "", new_text).strip()
-
-    result = record.edit_note(old_text, clean_new_text)
-    if "edited" in result.lower():
-        for note in record.notes:
-            if note.text.strip().lower() == clean_new_text.lower():
-                if tags:
-                    note.tags = set(tags)
+    result, new_note = record.edit_note(old_text, new_text)
+    if new_note is not None:
+        book.unindex_note(record, old_note)
+        book.index_note(record, new_note)
+        book._dirty = True
+        tags = sorted(new_note.tags)
         return f"✅ Note updated{' with tags: ' + ', '.join(tags) if tags else ''}"
     return result
     
@@ -844,24 +1168,28 @@ def remove_note(args, book, command="removenote"):
     if not args:
         raise IndexError
 
-    for i in range(1, len(args) + 1):
-        possible_name = normalize_name(" ".join(args[:i]))
-        if book.name_exists(possible_name):
-            name = possible_name
-            record = book.find(name)
-            note_text = " ".join(args[i:]).strip()
-
-            if not note_text:
-                if not record.notes:
-                    return f"ℹ️ No notes to remove for '{name}'."
-                record.notes.clear()
-                return f"🗑️ All notes removed for '{name}'."
-
-            if record.remove_note(note_text):
-                return "✅ Note removed!"
-            else:
-                return "😓 Note not found."
-    return "🤔 Please provide the contact name and note text to remove."
+    name, i = book.match_name_prefix(args, len(args))
+    if name is None:
+        return "🤔 Please provide the contact name and note text to remove."
+    record = book.find(name)
+    note_text = " ".join(args[i:]).strip()
+
+    if not note_text:
+        if not record.notes:
+            return f"ℹ️ No notes to remove for '{name}'."
+        for note in record.notes.values():
+            book.unindex_note(record, note)
+        record.clear_notes()
+        book._dirty = True
+        return f"🗑️ All notes removed for '{name}'."
+
+    removed_note = record.remove_note(note_text)
+    if removed_note:
+        book.unindex_note(record, removed_note)
+        book._dirty = True
+        return "✅ Note removed!"
+    else:
+        return MSG_NOTE_NOT_FOUND
 
 @input_error
 def search_note(args, book, command="searchnote"):
@@ -869,14 +1197,16 @@ def search_note(args, book, command="searchnote"):
         raise IndexError
 
     query = " ".join(args).lower()
-    matches = set()
+    matches = []
 
     for record in book.values():
-        name_match = query in record.name.value.lower()
-        for note in record.notes:
-            note_match = query in note.text.lower()
-            if name_match or note_match:
-                matches.add(f"{record.name.value}: {note}")
+        if query in record._name_lower:
+            # A matching name lists all of the contact's notes.
+            matches.extend(f"{record.name.value}: {note}" for note in record.notes.values())
+            continue
+        for note in record.notes.values():
+            if query in note._norm:
+                matches.append(f"{record.name.value}: {note}")
 
     return "\n".join(matches) if matches else "😓 No notes found."
 
@@ -884,28 +1214,26 @@ def search_note(args, book, command="searchnote"):
 def add_tag_to_note(args, book, command="addtag"):
     if len(args) < 3:
         raise IndexError
-    for i in range(1, len(args) - 1):
-        name_try = normalize_name(" ".join(args[:i]))
-        if book.name_exists(name_try):
-            name = name_try
-            break
-    else:
+    name, i = book.match_name_prefix(args, len(args) - 2)
+    if name is None:
         return "📝 Please provide the contact name, note text and tag to add."
 
     record = book.find(name)
     note_text = " ".join(args[i:-1])
     tag = args[-1].lstrip("#").lower()
 
-    for note in record.notes:
-        if note.text.strip().lower() == note_text.strip().lower():
-            try:
-                if tag in note.tags:
-                    return f"⚠️ Tag '#{tag}' is already present in the note."
-                note.add_tag(tag)
-                return f"🏷️ Tag '#{tag}' added to note: {note.text}"
-            except ValueError as ve:
-                return str(ve)
-    return "😓 Note not found. Please check the note text. Be exact."
+    note = record.notes.get(note_text.strip().lower())
+    if note is None:
+        return "😓 Note not found. Please check the note text. Be exact."
+    try:
+        if tag in note.tags:
+            return f"⚠️ Tag '#{tag}' is already present in the note."
+        record.add_note_tag(note, tag)
+        book.index_note(record, note, [tag])
+        book._dirty = True
+        return f"🏷️ Tag '#{tag}' added to note: {note.text}"
+    except ValueError as ve:
+        return str(ve)
 
 
 @input_error
@@ -913,75 +1241,109 @@ def remove_tag_from_note(args, book, command="removetag"):
     if len(args) < 2:
         raise IndexError
 
-    for i in range(1, len(args) + 1):
-        name_try = normalize_name(" ".join(args[:i]))
-        if book.name_exists(name_try):
-            name = name_try
-            rest_args = args[i:]
-            break
-    else:
+    name, i = book.match_name_prefix(args, len(args))
+    if name is None:
         return "😓 Please provide the contact name, note text and a tag to remove."
+    rest_args = args[i:]
 
     if not rest_args:
         return "😓 Please provide the note text and a tag to remove."
 
     full_text = " ".join(rest_args)
-    tag_match = re.search(r"#\w+", full_text)
-    tag_to_remove = tag_match.group(0)[1:].lower() if tag_match else None
-    note_text = re.sub(r"#\w+", "", full_text).strip()
+    tag_match = HASHTAG_PATTERN.search(full_text)
+    tag_to_remove = tag_match.group(1).lower() if tag_match else None
+    note_text = HASHTAG_PATTERN.sub("", full_text).strip()
 
     record = book.find(name)
 
-    for note in record.notes:
-        if note.text.strip().lower() == note_text.lower():
-            if tag_to_remove:
-                if tag_to_remove in note.tags:
-                    note.tags.remove(tag_to_remove)
-                    return f"🗑️ Tag '#{tag_to_remove}' removed from note: '{note.text}'"
-                else:
-                    return f"😓 Tag '#{tag_to_remove}' not found in this note."
-            else:
-                if note.tags:
-                    note.tags.clear()
-                    return f"🗑️ All tags removed from note: '{note.text}'"
-                else:
-                    return f"ℹ️ This note has no tags."
-    return f"🤔 Please provide the note text and a tag to remove for '{name}'."
+    note = record.notes.get(note_text.lower())
+    if note is None:
+        return f"🤔 Please provide the note text and a tag to remove for '{name}'."
+    if tag_to_remove:
+        if tag_to_remove in note.tags:
+            record.remove_note_tag(note, tag_to_remove)
+            book.unindex_note(record, note, [tag_to_remove])
+            book._dirty = True
+            return f"🗑️ Tag '#{tag_to_remove}' removed from note: '{note.text}'"
+        else:
+            return f"😓 Tag '#{tag_to_remove}' not found in this note."
+    else:
+        if note.tags:
+            book.unindex_note(record, note)
+            record.remove_note_tag(note)
+            book._dirty = True
+            return f"🗑️ All tags removed from note: '{note.text}'"
+        else:
+            return f"ℹ️ This note has no tags."
 
 @input_error
 def search_note_by_tag(args, book, command="searchtag"):
     if not args:
         raise IndexError
     tag = args[0].lstrip("#").lower()
-    matches = []
-    for record in book.values():
-        for note in record.notes:
-            if note.has_tag(tag):
-                matches.append(f"{record.name.value}: {note}")
+    matches = [f"{record.name.value}: {note}" for record, note in book.notes_with_tag(tag)]
     return "\n".join(matches) if matches else f"😓 No notes with tag '#{tag}' found."
 
 
 @input_error
 def sort_note_by_tag(args, book, command="sorttag"):
-    tag_map = {}
-
-    for record in book.values():
-        for note in record.notes:
-            for tag in note.tags:
-                tag = tag.lower()
-                tag_map.setdefault(tag, []).append((record.name.value, note))
-
-    if not tag_map:
+    if not book._tag_index:
         return "😓 No tagged notes to sort."
+    # Every change that affects this listing goes through index_note or
+    # unindex_note, which drop the cached copy.
+    if book._sorted_tag_render is not None:
+        return book._sorted_tag_render
 
+    positions = book.note_positions()
     result_lines = []
-    for tag in sorted(tag_map):
+    for tag in sorted(book._tag_index):
+        entries = sorted(book._tag_index[tag], key=lambda entry: positions[id(entry[1])])
         result_lines.append(f"📌 #{tag}")
-        for name, note in tag_map[tag]:
-            result_lines.append(f"{name}: {note}")
+        result_lines.extend(f"{record.name.value}: {note}" for record, note in entries)
         result_lines.append("")  # empty line for spacing
 
-    return "\n".join(result_lines)
+    book._sorted_tag_render = "\n".join(result_lines)
+    return book._sorted_tag_render
+
+COMMANDS = {
+    "addcontact": add_contact,
+    "editname": edit_contact_name,
+    "removecontact": remove_contact,
+    "addphone": add_phone_to_contact,
+    "changephone": change_contact,
+    "removephone": remove_phone,
+    "showphone": show_phone,
+    "addbday": add_birthday,
+    "showbday": show_birthday,
+    "editbday": edit_birthday,
+    "removebday": remove_birthday,
+    "upcomingbdays": upcoming_birthdays,
+    "search": search_contacts,
+    "addemail": add_email,
+    "editemail": edit_email,
+    "removeemail": remove_email,
+    "addnote": add_note,
+    "editnote": edit_note,
+    "removenote": remove_note,
+    "searchnote": search_note,
+    "addtag": add_tag_to_note,
+    "removetag": remove_tag_from_note,
+    "searchtag": search_note_by_tag,
+    "sorttag": sort_note_by_tag,
+    "addaddress": add_address,
+    "editaddress": edit_address,
+    "removeaddress": remove_address,
+}
+VALID_COMMANDS = ["hello", "help", "exit", "close", "all", *COMMANDS]
+SORTED_COMMANDS = sorted(VALID_COMMANDS)
+COMMAND_TREE = BKTree(VALID_COMMANDS)
+
+def complete_command(text, state):
+    # Only the first word on the line is a command.
+    if readline.get_begidx() > 0:
+        return None
+    matches = commands_with_prefix(text)
+    return matches[state] if state < len(matches) else None
 
 def print_available_commands():
     command_groups = {
@@ -1004,14 +1366,13 @@ def print_available_commands():
 def main():
     filename = DEFAULT_FILENAME
     book = load_address_book(filename)
-    valid_commands = [
-        "hello", "help", "exit", "close", "addcontact", "editname", "removecontact",
-        "addphone", "changephone", "removephone", "showphone", "addbday", "showbday",
-        "editbday", "removebday", "upcomingbdays", "search", "all", "addemail",
-        "editemail", "removeemail", "addaddress", "editaddress", "removeaddress",
-        "addnote", "editnote", "removenote", "searchnote", "addtag", 
-        "removetag", "searchtag", "sorttag"
-    ]
+    last_save = time.monotonic()
+    if readline is not None:
+        readline.set_completer(complete_command)
+        if "libedit" in (readline.__doc__ or ""):
+            readline.parse_and_bind("bind ^I rl_complete")
+        else:
+            readline.parse_and_bind("tab: complete")
     console.print("😊 Welcome to the assistant bot!", style="green")
     console.print(f"Upcoming Birthdays:\n{upcoming_birthdays([], book)}", style="yellow")
     console.print("\nType 'help' to see available commands.", style="blue")
@@ -1023,135 +1384,28 @@ def main():
                 continue
             command, args = parse_input(user_input)
             if command in ["exit", "close", "ex"]:
-                save_address_book(book, filename)
                 console.print("👋 Good bye!", style="green")
                 break
             elif command == "hello":
                 console.print("😊 How can I help you?", style="green")
-            elif command == "addcontact":
-                result = add_contact(args, book, command="addcontact")
-                console.print(result, style="green")
-                if "added" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "editname":
-                result = edit_contact_name(args, book, command="editname")
-                console.print(result, style="green")
-                if "changed" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "removecontact":
-                result = remove_contact(args, book, command="removecontact")
-                console.print(result, style="green")
-                if "removed" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "addphone":
-                result = add_phone_to_contact(args, book, command="addphone")
-                console.print(result, style="green")
-                if "added" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "changephone":
-                result = change_contact(args, book, command="changephone")
-                console.print(result, style="green")
-                if "updated" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "removephone":
-                result = remove_phone(args, book, command="removephone")
-                console.print(result, style="green")
-                if "removed" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "showphone":
-                console.print(show_phone(args, book, command="showphone"), style="green")
-            elif command == "addbday":
-                result = add_birthday(args, book, command="addbday")
-                console.print(result, style="green")
-                if "added" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "showbday":
-                console.print(show_birthday(args, book, command="showbday"), style="green")
-            elif command == "editbday":
-                result = edit_birthday(args, book, command="editbday")
-                console.print(result, style="green")
-                if "updated" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "removebday":
-                result = remove_birthday(args, book, command="removebday")
-                console.print(result, style="green")
-                if "removed" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "upcomingbdays":
-                console.print(upcoming_birthdays(args, book, command="upcomingbdays"), style="green")
-            elif command == "search":
-                console.print(search_contacts(args, book, command="search"), style="green")
             elif command == "all":
                 show_all_rich(book)
-            elif command == "addemail":
-                result = add_email(args, book, command="addemail")
-                console.print(result, style="green")
-                if "added" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "editemail":
-                result = edit_email(args, book, command="editemail")
-                console.print(result, style="green")
-                if "updated" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "removeemail":
-                result = remove_email(args, book, command="removeemail")
-                console.print(result, style="green")
-                if "removed" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "addnote":
-                result = add_note(args, book, command="addnote")
-                console.print(result, style="green")
-                if "added" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "editnote":
-                result = edit_note(args, book, command="editnote")
-                console.print(result, style="green")
-                if "updated" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "removenote":
-                result = remove_note(args, book, command="removenote")
-                console.print(result, style="green")
-                if "removed" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "searchnote":
-                console.print(search_note(args, book, command="searchnote"), style="green")
-            elif command == "addtag":
-                result = add_tag_to_note(args, book, command="addtag")
-                console.print(result, style="green")
-                save_address_book(book, filename)
-            elif command == "removetag":
-                result = remove_tag_from_note(args, book, command="removetag")
-                console.print(result, style="green")
-                save_address_book(book, filename)
-            elif command == "searchtag":
-                result = search_note_by_tag(args, book, command="searchtag")
-                console.print(result, style="green")
-            elif command == "sorttag":
-                result = sort_note_by_tag(args, book, command="sorttag")
-                console.print(result, style="green")
-            elif command == "addaddress":
-                result = add_address(args, book, command="addaddress")
-                console.print(result, style="green")
-                if "added" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "editaddress":
-                result = edit_address(args, book, command="editaddress")
-                console.print(result, style="green")
-                if "updated" in result.lower():
-                    save_address_book(book, filename)
-            elif command == "removeaddress":
-                result = remove_address(args, book, command="removeaddress")
-                console.print(result, style="green")
-                if "removed" in result.lower():
-                    save_address_book(book, filename)
             elif command == "help":
                 print_available_commands()
+            elif command in COMMANDS:
+                console.print(COMMANDS[command](args, book, command=command), style="green")
             else:
-                console.print(suggest_command(command, valid_commands), style="yellow")
-    except KeyboardInterrupt:
+                console.print(suggest_command(command), style="yellow")
+
+            if book._dirty and time.monotonic() - last_save > SAVE_INTERVAL:
+                save_address_book(book, filename)
+                last_save = time.monotonic()
+    except (KeyboardInterrupt, EOFError):
         console.print("\n👋 Good bye!", style="green")
-        save_address_book(book, filename)
-        console.print("📚 Address book saved successfully.", style="green")
+    finally:
+        # Also runs on an unexpected error, so changes already made aren't lost.
+        if book._dirty and save_address_book(book, filename):
+            console.print("📚 Address book saved successfully.", style="green")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file